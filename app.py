@@ -4,6 +4,7 @@ from services.ai_service import AIService
 from services.google_search import GoogleSearchService
 from utils.pdf_processor import extract_text_from_pdf
 from utils.docx_generator import create_improved_docx
+from utils.cv_store import CVStore
 
 # ==========================================
 # 1. הגדרות דף (Page Config)
@@ -21,11 +22,28 @@ else:
     st.info("Style file loading...") # הודעה שקטה במקום קריסה אם הקובץ חסר
 
 # ==========================================
-# 3. אתחול משתני מערכת (Session State)
+# 3. אתחול משתני מערכת (Session State + Shared Store)
 # ==========================================
-if "cv_text" not in st.session_state: st.session_state.cv_text = ""
-if "job_desc" not in st.session_state: st.session_state.job_desc = ""
-if "search_results" not in st.session_state: st.session_state.search_results = []
+@st.cache_resource
+def get_store():
+    # מאגר משותף לכל הסשנים - ה-session מחזיק רק hash
+    return CVStore(os.getenv("CAREER_STORE_DB", os.path.join("data", "career_store.db")))
+
+store = get_store()
+
+if "cv_hash" not in st.session_state: st.session_state.cv_hash = None
+if "job_hash" not in st.session_state: st.session_state.job_hash = None
+if "search_hash" not in st.session_state: st.session_state.search_hash = None
+if "cv_file_id" not in st.session_state: st.session_state.cv_file_id = None
+
+cv_text = store.get_document(st.session_state.cv_hash)
+# הפניות שנמחקו מהמאגר (prune / מחיקה בסשן אחר) - מאפסים כדי לטעון מחדש
+if st.session_state.cv_hash and not cv_text:
+    st.session_state.cv_hash = None
+    st.session_state.cv_file_id = None
+job_desc = store.get_document(st.session_state.job_hash)
+if st.session_state.job_hash and not job_desc:
+    st.session_state.job_hash = None
 
 # ==========================================
 # 4. סרגל צדי - שלב 1 (Sidebar)
@@ -34,8 +52,28 @@ with st.sidebar:
     st.title("⚙️ Settings")
     pdf_file = st.file_uploader("📄 Step 1: Upload CV", type=['pdf'])
     if pdf_file:
-        st.session_state.cv_text = extract_text_from_pdf(pdf_file)
-        st.success("CV Loaded Successfully!")
+        # חילוץ ושמירה רק כשהקובץ משתנה - לא בכל rerun
+        if pdf_file.file_id != st.session_state.cv_file_id:
+            cv_text = extract_text_from_pdf(pdf_file)
+            st.session_state.cv_hash = store.put_document(cv_text, "cv") if cv_text else None
+            st.session_state.cv_file_id = pdf_file.file_id
+        if st.session_state.cv_hash:
+            st.success("CV Loaded Successfully!")
+
+    # היסטוריית ניתוחים עבור ה-CV הנוכחי, ממוינת לפי ציון
+    if st.session_state.cv_hash:
+        history = store.list_analyses(cv_hash=st.session_state.cv_hash, sort_by="score")
+        if history:
+            with st.expander(f"🗂️ Past Analyses ({len(history)})"):
+                for past in history:
+                    st.write(f"**{past['score']}%** - {past['job_preview'] or ''}...")
+
+        # מחיקת קורות החיים וכל הניתוחים שלהם מהמאגר
+        if st.button("🗑️ Delete my CV from storage"):
+            store.delete_document(st.session_state.cv_hash)
+            st.session_state.cv_hash = None
+            cv_text = ""
+            st.success("✅ CV and its analyses were deleted")
 
 # ==========================================
 # 5. ממשק ראשי
@@ -46,7 +84,7 @@ st.title("🎯 AI Career Optimizer Pro")
 st.subheader("🔍 Step 2: Find a Job")
 
 # הצגת אזהרה אם אין CV, אבל תן למשתמש לחפש בכל זאת
-if not st.session_state.cv_text:
+if not cv_text:
     st.warning("⚠️ טעינת CV תשפר את הניתוח! אך באפשרותך לחפש משרות גם עכשיו.")
 
 col1, col2 = st.columns([3, 1])
@@ -60,19 +98,22 @@ if col2.button("🔎 Search Jobs"):
             try:
                 results = GoogleSearchService.search_jobs(query)
                 if results:
-                    st.session_state.search_results = results
+                    st.session_state.search_hash = store.put_search_results(results)
                     st.success(f"✅ נמצאו {len(results)} משרות!")
                 else:
                     st.warning("⚠️ לא נמצאו תוצאות. אנא נסה חיפוש אחר.")
-                    st.session_state.search_results = []
+                    st.session_state.search_hash = None
             except Exception as e:
                 st.error(f"❌ שגיאה בחיפוש: {str(e)}")
-                st.session_state.search_results = []
+                st.session_state.search_hash = None
 
 # הצגת תוצאות
-if st.session_state.search_results:
+search_results = store.get_search_results(st.session_state.search_hash)
+if st.session_state.search_hash and not search_results:
+    st.session_state.search_hash = None
+if search_results:
     st.markdown("### 📋 תוצאות חיפוש:")
-    for i, item in enumerate(st.session_state.search_results):
+    for i, item in enumerate(search_results):
         # בדיקה שהמפתחות קיימים בתוצאה
         title = item.get('title', 'ללא כותרת')
         link = item.get('link', '#')
@@ -86,42 +127,55 @@ if st.session_state.search_results:
             </div>
             """, unsafe_allow_html=True)
             if st.button(f"📌 Analyze Job #{i+1}", key=f"select_{i}"):
-                st.session_state.job_desc = snippet
+                st.session_state.job_hash = store.put_document(snippet, "job")
+                job_desc = snippet
                 st.success("✅ Job details captured!")
 
 st.divider()
 
 # --- שלב 3: ניתוח התאמה ---
 st.subheader("📊 Step 3: Match Analysis")
-job_input = st.text_area("Job Description:", value=st.session_state.job_desc, height=150)
+job_input = st.text_area("Job Description:", value=job_desc, height=150)
+
+force_rerun = st.checkbox("🔄 Re-run analysis (ignore saved result)")
 
 if st.button("⚡ Run Deep ATS Analysis"):
     if not job_input or job_input.strip() == "":
         st.error("❌ אנא הקלד תיאור משרה!")
-    elif not st.session_state.cv_text:
+    elif not cv_text:
         st.error("❌ אנא טען CV תחילה בעמודה הצדדית (בשורה 'Step 1')!")
     else:
-        with st.spinner("🤖 AI is analyzing..."):
-            prompt = f"CV: {st.session_state.cv_text[:3000]} Job: {job_input}. Return JSON with 'score', 'missing_skills', 'action_plan'."
-            res = AIService.get_response(prompt)
+        job_hash = store.put_document(job_input, "job")
+        st.session_state.job_hash = job_hash
+        # ניתוח שכבר חושב עבור אותו CV ואותה משרה מוגש מיד מהמאגר
+        res = None if force_rerun else store.get_analysis(st.session_state.cv_hash, job_hash)
+        if res:
+            st.caption("⚡ Loaded from previous analysis")
+        else:
+            with st.spinner("🤖 AI is analyzing..."):
+                prompt = f"CV: {cv_text[:3000]} Job: {job_input}. Return JSON with 'score', 'missing_skills', 'action_plan'."
+                res = AIService.get_response(prompt)
+            # נשמר רק ניתוח תקין (ציון מספרי ורשימת כישורים)
             if res and isinstance(res, dict):
-                try:
-                    score = res.get('score', 'N/A')
-                    action_plan = res.get('action_plan', 'אין תוכנית פעולה זמינה')
-                    missing_skills = res.get('missing_skills', [])
-
-                    c1, c2 = st.columns([1, 2])
-                    c1.metric("Match Score", f"{score}%")
-                    c2.write(f"**📋 Action Plan:** {action_plan}")
-                    st.write("**🎯 Missing Keywords:**")
-                    if isinstance(missing_skills, list) and missing_skills:
-                        st.markdown(" ".join([f'<span class="keyword-tag">{kw}</span>' for kw in missing_skills]), unsafe_allow_html=True)
-                    else:
-                        st.info("✅ כל הכישורים נמצאים!")
-                except Exception as e:
-                    st.error(f"❌ שגיאה בעיבוד התוצאה: {str(e)}")
-            else:
-                st.error("❌ שגיאה בקבלת תשובה מ-AI Service")
+                store.save_analysis(st.session_state.cv_hash, job_hash, res)
+        if res and isinstance(res, dict):
+            try:
+                score = res.get('score', 'N/A')
+                action_plan = res.get('action_plan', 'אין תוכנית פעולה זמינה')
+                missing_skills = res.get('missing_skills', [])
+
+                c1, c2 = st.columns([1, 2])
+                c1.metric("Match Score", f"{score}%")
+                c2.write(f"**📋 Action Plan:** {action_plan}")
+                st.write("**🎯 Missing Keywords:**")
+                if isinstance(missing_skills, list) and missing_skills:
+                    st.markdown(" ".join([f'<span class="keyword-tag">{kw}</span>' for kw in missing_skills]), unsafe_allow_html=True)
+                else:
+                    st.info("✅ כל הכישורים נמצאים!")
+            except Exception as e:
+                st.error(f"❌ שגיאה בעיבוד התוצאה: {str(e)}")
+        else:
+            st.error("❌ שגיאה בקבלת תשובה מ-AI Service")
 
 st.divider()
 
@@ -130,11 +184,11 @@ st.subheader("📝 Step 4: Download Tailored CV")
 if st.button("🪄 Generate Word Document"):
     if not job_input or job_input.strip() == "":
         st.error("❌ אנא הקלד תיאור משרה תחילה!")
-    elif not st.session_state.cv_text:
+    elif not cv_text:
         st.error("❌ אנא טען CV תחילה בעמודה הצדדית!")
     else:
         with st.spinner("✨ Creating your Word file..."):
-            prompt = f"Tailor this CV to the job. CV: {st.session_state.cv_text[:3000]} Job: {job_input}. Return JSON with 'diff' (list of [text, status]) and 'explanation'."
+            prompt = f"Tailor this CV to the job. CV: {cv_text[:3000]} Job: {job_input}. Return JSON with 'diff' (list of [text, status]) and 'explanation'."
             res = AIService.get_response(prompt)
             if res and isinstance(res, dict):
                 try:
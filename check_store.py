@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Self-check for utils/cv_store.py (and the analysis cache in app.py)
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from utils.cv_store import CVStore, _to_score
+
+errors = []
+
+
+def check(name, condition):
+    print(f"  {'✅' if condition else '❌'} {name}")
+    if not condition:
+        errors.append(name)
+
+
+print("=" * 60)
+print("🗄️ CV STORE CHECK")
+print("=" * 60)
+
+# Check 1: Dedupe
+print("\n📄 Documents...")
+store = CVStore(":memory:")
+cv = store.put_document("  Python developer\n", "cv")
+check("same text (whitespace aside) -> same hash", cv == store.put_document("Python developer", "cv"))
+check("stored content is the normalized text", store.get_document(cv) == "Python developer")
+job = store.put_document("Python developer", "job")
+check("same text as another kind -> separate document", job != cv and store.get_document(job) == "Python developer")
+check("missing hash -> default", store.get_document("nope") == "" and store.get_document(None) == "")
+search = store.put_search_results([{"title": "Dev", "link": "#"}])
+check("search results round-trip", store.get_search_results(search) == [{"title": "Dev", "link": "#"}])
+
+# Check 2: Score parsing
+print("\n🔢 Scores...")
+check("'85%' -> 85.0", _to_score("85%") == 85.0)
+check("72 -> 72.0", _to_score(72) == 72.0)
+check("'N/A' -> None", _to_score("N/A") is None)
+check("None -> None", _to_score(None) is None)
+check("'inf' / 'Infinity' / 'nan' -> None",
+      all(_to_score(v) is None for v in ("inf", "Infinity", "-inf", "nan")))
+
+# Check 3: Analyses
+print("\n📊 Analyses...")
+jobs = [store.put_document(f"Job {i}", "job") for i in range(3)]
+for job_hash, score in zip(jobs, ["40%", 90, 65]):
+    store.save_analysis(cv, job_hash, {"score": score, "missing_skills": ["SQL"], "action_plan": "Learn SQL"})
+other_cv = store.put_document("Designer", "cv")
+store.save_analysis(other_cv, jobs[0], {"score": 70, "missing_skills": []})
+
+result = store.get_analysis(cv, jobs[1])
+check("get_analysis returns saved result", result["score"] == 90 and result["missing_skills"] == ["SQL"])
+check("unknown pair -> None", store.get_analysis(cv, "nope") is None)
+bad_job = store.put_document("Bad job", "job")
+check("non-finite score not cached",
+      not store.save_analysis(cv, bad_job, {"score": "Infinity", "missing_skills": []}))
+check("missing / non-numeric score not cached",
+      not store.save_analysis(cv, bad_job, {"missing_skills": []})
+      and not store.save_analysis(cv, bad_job, {"score": "high", "missing_skills": []}))
+check("non-list missing_skills not cached",
+      not store.save_analysis(cv, bad_job, {"score": 50, "missing_skills": "SQL"}))
+check("nothing stored for rejected results", store.get_analysis(cv, bad_job) is None)
+check("filter by cv_hash", len(store.list_analyses(cv_hash=cv)) == 3)
+check("filter by job_hash", {a["cv_hash"] for a in store.list_analyses(job_hash=jobs[0])} == {cv, other_cv})
+check("min_score filter", [a["score"] for a in store.list_analyses(cv_hash=cv, min_score=50)] == [90, 65])
+check("sorted by score desc", [a["score"] for a in store.list_analyses(cv_hash=cv)] == [90, 65, 40])
+check("job preview joined into list_analyses",
+      [a["job_preview"] for a in store.list_analyses(cv_hash=cv)] == ["Job 1", "Job 2", "Job 0"])
+check("limit", len(store.list_analyses(limit=1)) == 1)
+try:
+    store.list_analyses(sort_by="cv_hash; DROP TABLE analyses")
+    check("unknown sort column rejected", False)
+except ValueError:
+    check("unknown sort column rejected", True)
+
+# Check 4: Retention
+print("\n🧹 Retention...")
+store.delete_document(other_cv)
+check("delete_document removes document and its analyses",
+      store.get_document(other_cv) == "" and not store.list_analyses(cv_hash=other_cv))
+store.prune(now=time.time() + store.search_ttl + 1)
+check("search results expire after SEARCH_TTL", store.get_search_results(search) == [])
+check("CVs survive past SEARCH_TTL", store.get_document(cv) == "Python developer")
+store.max_analyses = 2
+store.prune()
+check("analyses capped at max_analyses", len(store.list_analyses(limit=100)) == 2)
+store.prune(now=time.time() + store.document_ttl + 1)
+check("documents and their analyses expire after DOCUMENT_TTL",
+      store.get_document(cv) == "" and not store.list_analyses(limit=100))
+store.close()
+
+short = CVStore(":memory:", search_ttl=2, document_ttl=2)
+old_cv = short.put_document("Old CV", "cv")
+time.sleep(1.5)
+check("re-put of an existing document returns the same hash", short.put_document("Old CV", "cv") == old_cv)
+time.sleep(1.0)
+short.prune()
+check("expiry counts from last use, not first insert", short.get_document(old_cv) == "Old CV")
+time.sleep(2.1)
+short.prune()
+check("unused document expires", short.get_document(old_cv) == "")
+short.close()
+
+# Check 5: Analysis cache in app.py (needs streamlit)
+print("\n⚡ App analysis cache...")
+try:
+    from unittest import mock
+    from streamlit.testing.v1 import AppTest
+except ImportError:
+    print("  ⚠️ streamlit not installed - skipped")
+else:
+    ai_calls = []
+
+    def gemini_post(url, **kwargs):
+        ai_calls.append(url)
+        result = {"score": 80, "missing_skills": ["Docker"], "action_plan": "Ship it"}
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {"candidates": [{"content": {"parts": [{"text": json.dumps(result)}]}}]}
+        return response
+
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp_dir:
+        os.environ["CAREER_STORE_DB"] = os.path.join(tmp_dir, "check.db")
+        app_store = CVStore(os.environ["CAREER_STORE_DB"])
+        cv_hash = app_store.put_document("Backend developer, Python", "cv")
+        app_store.close()
+
+        at = AppTest.from_file("app.py", default_timeout=30)
+        at.secrets["GEMINI_API_KEY"] = "stub"
+        at.session_state["cv_hash"] = cv_hash
+        with mock.patch("requests.post", new=gemini_post):
+            at.run()
+            at.text_area[0].input("Python backend role")
+            for _ in range(2):
+                next(b for b in at.button if b.label == "⚡ Run Deep ATS Analysis").click().run()
+                check("match score rendered", bool(at.metric) and at.metric[0].value == "80%")
+        check("second analysis served from the store (1 AI call)", len(ai_calls) == 1)
+        check("cache hit is announced", any("previous analysis" in c.value for c in at.caption))
+        with mock.patch("requests.post", new=gemini_post):
+            at.checkbox[0].check().run()
+            next(b for b in at.button if b.label == "⚡ Run Deep ATS Analysis").click().run()
+        check("re-run option skips the saved result", len(ai_calls) == 2)
+
+        from load_test import make_cv_pdf, supports_upload
+        if supports_upload():
+            at = AppTest.from_file("app.py", default_timeout=30)
+            at.run()
+            at.sidebar.file_uploader[0].upload("cv.pdf", make_cv_pdf("Data engineer, Spark"), "application/pdf").run()
+            uploaded_hash = at.session_state["cv_hash"]
+            other_session = CVStore(os.environ["CAREER_STORE_DB"])
+            other_session.delete_document(uploaded_hash)
+            other_session.close()
+            at.run()
+            check("deleted CV is re-extracted from the uploaded file",
+                  at.session_state["cv_hash"] == uploaded_hash and not at.warning)
+
+        # Release the app's cached store so its SQLite files can be removed
+        import gc
+        import streamlit as st
+        st.cache_resource.clear()
+        gc.collect()
+
+print("\n" + "=" * 60)
+if errors:
+    print(f"❌ {len(errors)} checks failed")
+    sys.exit(1)
+print("✨ All store checks passed!")
+print("=" * 60)
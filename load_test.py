@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Concurrent-session load test for app.py
+
+Drives N simulated sessions through upload -> search -> analyze -> download
+with Streamlit's AppTest API. Gemini and Custom Search are replaced by local
+stubs (no network, no real API keys), so the numbers reflect app.py itself.
+
+    python load_test.py --levels 1 2 4 8 16
+    python load_test.py --save-baseline load_baseline.json
+    python load_test.py --baseline load_baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from unittest import mock
+
+STEPS = ["upload", "search", "select", "analyze", "download"]
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+# ==========================================
+# Stubs for Gemini / Custom Search
+# ==========================================
+class StubResponse:
+    def __init__(self, payload, status_code=200):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+def make_stubs(ai_latency, search_latency):
+    def gemini_post(url, **kwargs):
+        time.sleep(ai_latency)
+        prompt = kwargs["json"]["contents"][0]["parts"][0]["text"]
+        if prompt.startswith("Tailor this CV"):
+            result = {"diff": [["Experienced ", "keep"], ["Python ", "add"], ["Java ", "remove"]],
+                      "explanation": "Stub tailoring"}
+        else:
+            result = {"score": 72, "missing_skills": ["Docker", "SQL"], "action_plan": "Stub plan"}
+        return StubResponse({"candidates": [{"content": {"parts": [{"text": json.dumps(result)}]}}]})
+
+    def search_get(url, params=None, **kwargs):
+        time.sleep(search_latency)
+        items = [{"title": f"{params['q']} #{i}", "link": f"https://example.com/jobs/{i}",
+                  "snippet": f"Looking for {params['q']} with Python, SQL and Docker ({i})"}
+                 for i in range(params.get("num", 5))]
+        return StubResponse({"items": items})
+
+    return gemini_post, search_get
+
+
+# ==========================================
+# CV fixture
+# ==========================================
+def make_cv_pdf(text):
+    """Minimal one-page PDF with extractable text (no PDF writer dependency)."""
+    lines = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in text.splitlines()]
+    stream = "BT /F1 11 Tf 50 780 Td 14 TL " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        "/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+    ]
+    pdf = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return pdf.encode("latin-1")
+
+
+def supports_upload():
+    """AppTest.file_uploader(...).upload() exists only in recent Streamlit versions."""
+    try:
+        from streamlit.testing.v1.element_tree import FileUploader
+    except ImportError:
+        return False
+    return hasattr(FileUploader, "upload")
+
+
+# ==========================================
+# Shared Streamlit runtime
+# ==========================================
+@contextmanager
+def shared_runtime():
+    """One runtime, script cache, set of secrets and config for every session.
+
+    AppTest swaps Runtime._instance, st.secrets and the appTest config option
+    in and out around each run, and re-compiles app.py and re-discovers
+    components for every session, which races (and dominates the timings)
+    when sessions run concurrently. A real server shares these across
+    sessions, so pin them for the whole test.
+    """
+    import streamlit as st
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.runtime.secrets import Secrets
+    from streamlit.testing.v1.util import patch_config_options
+
+    runtime = mock.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    try:
+        from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+        runtime.dataframe_source_mgr = DataframeSourceManager()
+    except ImportError:
+        pass
+
+    patches = []
+    try:
+        from streamlit.components.v2.component_manager import BidiComponentManager
+        components = BidiComponentManager()
+        components.discover_and_register_components(start_file_watching=False)
+        patches.append(mock.patch.object(components, "discover_and_register_components"))
+        patches.append(mock.patch("streamlit.testing.v1.app_test.BidiComponentManager", lambda: components))
+    except ImportError:
+        pass
+
+    secrets = Secrets()
+    secrets._secrets = {key: "stub" for key in ("GEMINI_API_KEY", "GOOGLE_API_KEY", "SEARCH_ENGINE_ID")}
+
+    script_cache = ScriptCache()
+    # Sessions set session_state from outside a run on purpose
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+
+    with mock.patch("streamlit.testing.v1.app_test.ScriptCache", lambda: script_cache), \
+            mock.patch("streamlit.testing.v1.local_script_runner.ScriptCache", lambda: script_cache), \
+            mock.patch.object(Runtime, "instance", classmethod(lambda cls: runtime)), \
+            mock.patch.object(Runtime, "exists", classmethod(lambda cls: True)), \
+            mock.patch.object(st, "secrets", secrets), \
+            patch_config_options({"global.appTest": True}), \
+            ExitStack() as stack:
+        for patch in patches:
+            stack.enter_context(patch)
+        yield
+
+
+# ==========================================
+# Simulated session
+# ==========================================
+def _click(at, label):
+    for button in at.button:
+        if button.label == label:
+            return button.click().run()
+    raise AssertionError(f"Button not found: {label}")
+
+
+def _check(at, step):
+    if at.exception:
+        raise AssertionError(f"{step}: {at.exception[0].message}")
+    if at.error:
+        raise AssertionError(f"{step}: {at.error[0].value}")
+
+
+def run_session(timeout, store=None):
+    """One user's flow. Without `store` the CV goes through st.file_uploader;
+    with it (older Streamlit) the extracted text is injected into the store."""
+    from streamlit.testing.v1 import AppTest
+
+    timings = {}
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    # Each session gets a unique CV so analyses are never served from the store
+    cv_text = f"Session {uuid.uuid4()}\nPython developer, 5 years experience, Flask, REST APIs."
+
+    if store is None:
+        at.run()
+        _check(at, "render")
+        pdf = make_cv_pdf(cv_text)
+        start = time.perf_counter()
+        at.sidebar.file_uploader[0].upload("cv.pdf", pdf, "application/pdf").run()
+        _check(at, "upload")
+        if not at.session_state["cv_hash"]:
+            raise AssertionError("upload: CV text was not extracted")
+    else:
+        at.session_state["cv_hash"] = store.put_document(cv_text, "cv")
+        start = time.perf_counter()
+        at.run()
+        _check(at, "upload")
+    timings["upload"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    at.text_input(key="job_query").input("python developer")
+    _click(at, "🔎 Search Jobs")
+    _check(at, "search")
+    timings["search"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _click(at, "📌 Analyze Job #1")
+    _check(at, "select")
+    timings["select"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _click(at, "⚡ Run Deep ATS Analysis")
+    _check(at, "analyze")
+    if not at.metric:
+        raise AssertionError("analyze: no match score rendered")
+    timings["analyze"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _click(at, "🪄 Generate Word Document")
+    _check(at, "download")
+    if not any("Word" in s.value for s in at.success):
+        raise AssertionError("download: Word document was not generated")
+    timings["download"] = time.perf_counter() - start
+
+    return timings
+
+
+# ==========================================
+# Measurement
+# ==========================================
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+class ThreadSampler:
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_level(concurrency, sessions, timeout, track_memory, store=None):
+    results, errors = [], []
+
+    if track_memory:
+        tracemalloc.reset_peak()
+        mem_before = tracemalloc.get_traced_memory()[0]
+
+    with ThreadSampler() as sampler:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(run_session, timeout, store) for _ in range(sessions)]
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    errors.append(str(e))
+        wall = time.perf_counter() - start
+
+    report = {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "completed": len(results),
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "wall_s": round(wall, 3),
+        "throughput_sps": round(len(results) / wall, 3) if wall else 0.0,
+        "peak_threads": sampler.peak,
+        "steps": {},
+    }
+    for step in STEPS:
+        values = [r[step] for r in results]
+        report["steps"][step] = {
+            f"p{p}": round(percentile(values, p), 4) if values else None for p in (50, 95, 99)
+        }
+    if track_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        report["memory_per_session_kb"] = round((peak - mem_before) / 1024 / concurrency, 1)
+    return report
+
+
+def find_saturation(levels, min_gain, max_slowdown):
+    """First level where throughput stops growing or p95 latency blows up."""
+    best = None
+    base_p95 = None
+    for level in levels:
+        total_p95 = sum(s["p95"] or 0 for s in level["steps"].values())
+        if base_p95 is None:
+            base_p95 = total_p95
+        if level["errors"]:
+            return level["concurrency"], "errors"
+        if best is not None and level["throughput_sps"] < best * (1 + min_gain):
+            return level["concurrency"], "throughput plateau"
+        if base_p95 and total_p95 > base_p95 * max_slowdown:
+            return level["concurrency"], "latency collapse"
+        best = max(best or 0, level["throughput_sps"])
+    return None, "not reached"
+
+
+COMPARABLE_CONFIG = ("ai_latency", "search_latency", "sessions_per_worker", "no_memory", "upload_path")
+
+
+def compare_to_baseline(report, baseline, tolerance):
+    mismatched = [key for key in COMPARABLE_CONFIG
+                  if report["config"].get(key) != baseline["config"].get(key)]
+    if mismatched:
+        return ["config differs from baseline: " + ", ".join(
+            f"{key}={baseline['config'].get(key)} -> {report['config'].get(key)}" for key in mismatched)]
+
+    failures = []
+    previous = {level["concurrency"]: level for level in baseline["levels"]}
+    for level in report["levels"]:
+        old = previous.get(level["concurrency"])
+        if not old:
+            continue
+        if level["errors"] > old["errors"]:
+            failures.append(f"c={level['concurrency']}: errors {old['errors']} -> {level['errors']}")
+        if level["throughput_sps"] < old["throughput_sps"] * (1 - tolerance):
+            failures.append(f"c={level['concurrency']}: throughput "
+                            f"{old['throughput_sps']} -> {level['throughput_sps']} sessions/s")
+        for step in STEPS:
+            new_p95 = level["steps"][step]["p95"]
+            old_p95 = old["steps"][step]["p95"]
+            if new_p95 and old_p95 and new_p95 > old_p95 * (1 + tolerance):
+                failures.append(f"c={level['concurrency']}: {step} p95 {old_p95}s -> {new_p95}s")
+
+    old_sat = baseline["saturation"]["concurrency"]
+    new_sat = report["saturation"]["concurrency"]
+    if (old_sat is None and new_sat is not None) or (old_sat and new_sat and new_sat < old_sat):
+        failures.append(f"saturation point {old_sat} -> {new_sat}")
+    return failures
+
+
+def print_level(level):
+    print(f"\n👥 concurrency={level['concurrency']:<3} sessions={level['sessions']:<4} "
+          f"ok={level['completed']:<4} errors={level['errors']:<3} "
+          f"throughput={level['throughput_sps']:.2f}/s threads={level['peak_threads']}"
+          + (f" mem/session={level['memory_per_session_kb']}KB" if "memory_per_session_kb" in level else ""))
+    for step in STEPS:
+        s = level["steps"][step]
+        if s["p50"] is not None:
+            print(f"   {step:<9} p50={s['p50']:.3f}s p95={s['p95']:.3f}s p99={s['p99']:.3f}s")
+    for error in level["error_samples"]:
+        print(f"   ❌ {error}")
+
+
+def run_levels(args):
+    from utils.cv_store import CVStore
+
+    # Fallback path only: one harness connection, opened outside any timed step
+    store = None if supports_upload() else CVStore(os.environ["CAREER_STORE_DB"])
+    upload_path = "st.file_uploader" if store is None else "session_state injection"
+
+    gemini_post, search_get = make_stubs(args.ai_latency, args.search_latency)
+    if not args.no_memory:
+        tracemalloc.start()
+
+    levels = []
+    try:
+        # Plain functions, not MagicMocks: call_args_list would grow with every prompt
+        with shared_runtime(), \
+                mock.patch("requests.post", new=gemini_post), \
+                mock.patch("requests.get", new=search_get):
+            # Warm-up: imports, cache_resource and script compilation are not per-session costs
+            run_session(args.timeout, store)
+            for concurrency in args.levels:
+                level = run_level(concurrency, concurrency * args.sessions_per_worker,
+                                  args.timeout, not args.no_memory, store)
+                print_level(level)
+                levels.append(level)
+    finally:
+        if not args.no_memory:
+            tracemalloc.stop()
+        if store is not None:
+            store.close()
+    return levels, upload_path
+
+
+def release_app_store():
+    """Drop app.py's cached CVStore so its SQLite/WAL files are closed before cleanup."""
+    import gc
+    import streamlit as st
+    st.cache_resource.clear()
+    gc.collect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for app.py")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="concurrency levels to run (sorted and de-duplicated)")
+    parser.add_argument("--sessions-per-worker", type=int, default=3)
+    parser.add_argument("--ai-latency", type=float, default=0.2, help="stub Gemini latency (s)")
+    parser.add_argument("--search-latency", type=float, default=0.1, help="stub Custom Search latency (s)")
+    parser.add_argument("--timeout", type=float, default=60, help="per-run AppTest timeout (s)")
+    parser.add_argument("--min-gain", type=float, default=0.10,
+                        help="throughput gain below which a level counts as saturated")
+    parser.add_argument("--max-slowdown", type=float, default=3.0,
+                        help="p95 multiple over the first level that counts as saturated")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (less overhead)")
+    parser.add_argument("--baseline", help="JSON report to compare against; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="allowed regression vs baseline")
+    parser.add_argument("--save-baseline", help="write this run's JSON report here")
+    args = parser.parse_args()
+    # find_saturation compares each level with the smaller ones before it
+    if min(args.levels) < 1:
+        parser.error("--levels must be positive")
+    args.levels = sorted(set(args.levels))
+
+    sys.path.insert(0, os.path.dirname(APP_PATH))
+    os.chdir(os.path.dirname(APP_PATH))
+
+    print("=" * 70)
+    print("🚦 Load test - AI Career Optimizer")
+    print("=" * 70)
+
+    # ignore_cleanup_errors: on Windows SQLite may still hold the files briefly
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp_dir:
+        os.environ["CAREER_STORE_DB"] = os.path.join(tmp_dir, "load_test.db")
+        try:
+            levels, upload_path = run_levels(args)
+        finally:
+            release_app_store()
+
+    print(f"\n📤 Upload path: {upload_path}")
+    saturation, reason = find_saturation(levels, args.min_gain, args.max_slowdown)
+    config = {k: v for k, v in vars(args).items() if k not in ("baseline", "save_baseline")}
+    config["upload_path"] = upload_path
+    report = {
+        "config": config,
+        "levels": levels,
+        "saturation": {"concurrency": saturation, "reason": reason},
+    }
+
+    print("\n" + "=" * 70)
+    print(f"📈 Saturation point: {saturation if saturation else '-'} ({reason})")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {args.save_baseline}")
+
+    failed = any(level["errors"] for level in levels)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures = compare_to_baseline(report, json.load(f), args.tolerance)
+        for failure in failures:
+            print(f"❌ Regression: {failure}")
+        failed = failed or bool(failures)
+        if not failures:
+            print("✅ No regressions vs baseline")
+
+    print("=" * 70)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
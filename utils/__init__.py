@@ -1,2 +1,3 @@
 from .pdf_processor import extract_text_from_pdf
-from .docx_generator import create_improved_docx
\ No newline at end of file
+from .docx_generator import create_improved_docx
+from .cv_store import CVStore, content_hash
\ No newline at end of file
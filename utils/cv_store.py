@@ -0,0 +1,272 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from urllib.request import pathname2url
+
+SEARCH_TTL = 6 * 3600           # search results are per-session scratch data
+DOCUMENT_TTL = 30 * 24 * 3600   # CVs and job descriptions (personal data)
+MAX_ANALYSES = 5000
+PRUNE_INTERVAL = 600
+TOUCH_INTERVAL = 3600           # refresh last_used_at at most this often, so reruns stay read-only
+
+
+def normalize_text(text):
+    return text.strip()
+
+
+def content_hash(text, kind):
+    return hashlib.sha256(f"{kind}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class CVStore:
+    """Shared SQLite store for CVs, job descriptions and past analyses.
+
+    Documents are stored once per (kind, content) hash, so sessions only need
+    to keep the hash in st.session_state. Analyses are indexed by
+    (cv_hash, job_hash). Each thread gets its own connection, so readers do
+    not wait on each other and WAL lets them run alongside a writer.
+    Rows expire by last use (put or read), not by first insert, according to
+    SEARCH_TTL, DOCUMENT_TTL and MAX_ANALYSES.
+    """
+
+    PREVIEW_LENGTH = 60
+    SORT_COLUMNS = {"score": "a.score", "created_at": "a.created_at", "last_used_at": "a.last_used_at"}
+
+    def __init__(self, db_path, search_ttl=SEARCH_TTL, document_ttl=DOCUMENT_TTL, max_analyses=MAX_ANALYSES):
+        if db_path == ":memory:":
+            # Shared-cache URI so every thread's connection sees the same database
+            self._uri = f"file:cvstore-{uuid.uuid4().hex}?mode=memory&cache=shared"
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._uri = "file:" + pathname2url(os.path.abspath(db_path))
+        self.search_ttl = search_ttl
+        self.document_ttl = document_ttl
+        self.max_analyses = max_analyses
+        # Touch well within the shortest TTL so a row in use never looks idle
+        self.touch_interval = min(TOUCH_INTERVAL, search_ttl / 2, document_ttl / 2)
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._last_prune = 0.0
+
+        conn = self._connection()
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    hash TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    cv_hash TEXT NOT NULL REFERENCES documents(hash),
+                    job_hash TEXT NOT NULL REFERENCES documents(hash),
+                    score REAL,
+                    missing_skills TEXT NOT NULL,
+                    action_plan TEXT,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    PRIMARY KEY (cv_hash, job_hash)
+                )
+            """)
+            # Databases created before last_used_at existed
+            for table in ("documents", "analyses"):
+                columns = [row["name"] for row in conn.execute(f"PRAGMA table_info({table})")]
+                if "last_used_at" not in columns:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN last_used_at REAL NOT NULL DEFAULT 0")
+                    conn.execute(f"UPDATE {table} SET last_used_at = created_at")
+            conn.execute("DROP INDEX IF EXISTS idx_documents_kind")
+            conn.execute("DROP INDEX IF EXISTS idx_analyses_created")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_used ON documents(kind, last_used_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_job ON analyses(job_hash)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_score ON analyses(score)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_used ON analyses(last_used_at)")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._uri, uri=True, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    # --- Documents (CV / job description / search results) ---
+    def put_document(self, content, kind):
+        content = normalize_text(content)
+        doc_hash = content_hash(content, kind)
+        conn = self._connection()
+        # Most puts are duplicates (reruns, re-uploads): check with a read before taking the write lock
+        row = conn.execute("SELECT last_used_at FROM documents WHERE hash = ?", (doc_hash,)).fetchone()
+        if row is None:
+            now = time.time()
+            with conn:
+                conn.execute(
+                    """INSERT OR IGNORE INTO documents (hash, kind, content, created_at, last_used_at)
+                       VALUES (?, ?, ?, ?, ?)""",
+                    (doc_hash, kind, content, now, now)
+                )
+            self._maybe_prune()
+        else:
+            self._touch("documents", "hash = ?", (doc_hash,), row["last_used_at"])
+        return doc_hash
+
+    def get_document(self, doc_hash, default=""):
+        if not doc_hash:
+            return default
+        row = self._connection().execute(
+            "SELECT content, last_used_at FROM documents WHERE hash = ?", (doc_hash,)
+        ).fetchone()
+        if row is None:
+            return default
+        self._touch("documents", "hash = ?", (doc_hash,), row["last_used_at"])
+        return row["content"]
+
+    def delete_document(self, doc_hash):
+        """Remove a document and every analysis that references it."""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM analyses WHERE cv_hash = ? OR job_hash = ?", (doc_hash, doc_hash))
+            conn.execute("DELETE FROM documents WHERE hash = ?", (doc_hash,))
+
+    def put_search_results(self, results):
+        return self.put_document(json.dumps(results, ensure_ascii=False, sort_keys=True), "search")
+
+    def get_search_results(self, doc_hash):
+        content = self.get_document(doc_hash)
+        return json.loads(content) if content else []
+
+    # --- Analyses (CV hash x job hash) ---
+    def save_analysis(self, cv_hash, job_hash, result):
+        """Cache a well-formed analysis; returns False (and stores nothing) otherwise.
+
+        Only results with a finite numeric score and a list of missing skills
+        are cached, so one malformed AI response is not served forever.
+        """
+        score = _to_score(result.get('score'))
+        missing_skills = result.get('missing_skills')
+        if score is None or not isinstance(missing_skills, list):
+            return False
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO analyses
+                   (cv_hash, job_hash, score, missing_skills, action_plan, created_at, last_used_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (cv_hash, job_hash, score, json.dumps(missing_skills, ensure_ascii=False),
+                 result.get('action_plan'), now, now)
+            )
+        self._maybe_prune()
+        return True
+
+    def get_analysis(self, cv_hash, job_hash):
+        row = self._connection().execute(
+            "SELECT * FROM analyses WHERE cv_hash = ? AND job_hash = ?", (cv_hash, job_hash)
+        ).fetchone()
+        if row is None:
+            return None
+        self._touch("analyses", "cv_hash = ? AND job_hash = ?", (cv_hash, job_hash), row["last_used_at"])
+        return _analysis_from_row(row)
+
+    def list_analyses(self, cv_hash=None, job_hash=None, min_score=None, sort_by="score", descending=True, limit=20):
+        if sort_by not in self.SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {sort_by}")
+
+        clauses, params = [], []
+        if cv_hash:
+            clauses.append("a.cv_hash = ?")
+            params.append(cv_hash)
+        if job_hash:
+            clauses.append("a.job_hash = ?")
+            params.append(job_hash)
+        if min_score is not None:
+            clauses.append("a.score >= ?")
+            params.append(min_score)
+
+        # Preview of the job description in the same query, not one lookup per row
+        query = f"""SELECT a.*, substr(d.content, 1, {self.PREVIEW_LENGTH}) AS job_preview
+                    FROM analyses a LEFT JOIN documents d ON d.hash = a.job_hash"""
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += f" ORDER BY {self.SORT_COLUMNS[sort_by]} {'DESC' if descending else 'ASC'} LIMIT ?"
+        params.append(limit)
+
+        rows = self._connection().execute(query, params).fetchall()
+        return [_analysis_from_row(row) for row in rows]
+
+    # --- Retention ---
+    def prune(self, now=None):
+        """Apply the retention policy: expire unused search results and documents, cap analyses."""
+        now = time.time() if now is None else now
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM documents WHERE kind = 'search' AND last_used_at < ?",
+                         (now - self.search_ttl,))
+            conn.execute("DELETE FROM documents WHERE kind != 'search' AND last_used_at < ?",
+                         (now - self.document_ttl,))
+            conn.execute("""
+                DELETE FROM analyses
+                WHERE cv_hash NOT IN (SELECT hash FROM documents)
+                   OR job_hash NOT IN (SELECT hash FROM documents)
+            """)
+            conn.execute("""
+                DELETE FROM analyses WHERE rowid NOT IN (
+                    SELECT rowid FROM analyses ORDER BY last_used_at DESC LIMIT ?
+                )
+            """, (self.max_analyses,))
+        self._last_prune = now
+
+    def _touch(self, table, where, params, last_used_at):
+        now = time.time()
+        if now - last_used_at >= self.touch_interval:
+            conn = self._connection()
+            with conn:
+                conn.execute(f"UPDATE {table} SET last_used_at = ? WHERE {where}", (now, *params))
+
+    def _maybe_prune(self):
+        if time.time() - self._last_prune >= PRUNE_INTERVAL:
+            self.prune()
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def _to_score(value):
+    try:
+        score = float(str(value).strip().rstrip('%'))
+    except (TypeError, ValueError):
+        return None
+    return score if math.isfinite(score) else None
+
+
+def _analysis_from_row(row):
+    score = row["score"]
+    if score is None:
+        score = 'N/A'
+    elif score == int(score):
+        score = int(score)
+    return {
+        'cv_hash': row["cv_hash"],
+        'job_hash': row["job_hash"],
+        'score': score,
+        'missing_skills': json.loads(row["missing_skills"]),
+        'action_plan': row["action_plan"],
+        'created_at': row["created_at"],
+        'last_used_at': row["last_used_at"],
+        'job_preview': row["job_preview"] if "job_preview" in row.keys() else None,
+    }